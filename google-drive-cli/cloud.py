@@ -1,9 +1,24 @@
-from pathlib import Path
-from typing import List
-
-from pydrive2.auth import GoogleAuth
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import cached_property, lru_cache
+from pathlib import Path, PurePosixPath
+from types import MappingProxyType
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from googleapiclient.errors import HttpError
+from httplib2 import HttpLib2Error
+from oauth2client.client import AccessTokenRefreshError
+from pydrive2.auth import AuthError, GoogleAuth
 from pydrive2.drive import GoogleDrive
-from pydrive2.files import GoogleDriveFile
+from pydrive2.files import ApiRequestError, GoogleDriveFile
+
+from rapidfuzz import utils
 
 from prompt_toolkit import ANSI
 from prompt_toolkit.shortcuts import print_formatted_text, prompt
@@ -11,10 +26,10 @@ from prompt_toolkit.shortcuts import print_formatted_text, prompt
 from exceptions import RemotePathNotFound
 
 
-# A dictionary linking all file extensions to their corresponding export endpoints
-SUPPORTED_FILE_TYPES = {
+# A read-only dictionary linking all file extensions to their corresponding export endpoints
+SUPPORTED_FILE_TYPES = MappingProxyType({
     '.html': 'text/html',
-    '.txt': 'plain_text',
+    '.txt': 'text/plain',
     '.rtf': 'application/rtf',
     '.odt': 'application/vnd.oasis.opendocument.text',
     '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
@@ -24,13 +39,210 @@ SUPPORTED_FILE_TYPES = {
     '.ods': 'application/x-vnd.oasis.opendocument.spreadsheet',
     '.tsv': 'text/tab-separated-values',
     '.csv': 'text/csv',
-    '.jpg': 'images/jpeg',
-    '.png': 'images/png',
-    '.svg': 'images/svg+xml',
+    '.jpg': 'image/jpeg',
+    '.png': 'image/png',
+    '.svg': 'image/svg+xml',
     '.pptx': 'application/vnd.openxmlformats-officedocument.presentationml.presentation',
     '.odp': 'application/vnd.oasis.opendocument.presentation',
     '.json': 'application/vnd.google-apps.script+json'
-}
+})
+
+# The mimetype Google Drive gives to every folder
+FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+
+# The only file fields we read from the cached manifest, requesting just these keeps the listing responses small
+FILE_FIELDS = 'id,title,mimeType,modifiedDate,fileSize,md5Checksum,ownerNames,exportLinks,labels(starred,trashed),' \
+              'parents(id,isRoot)'
+MANIFEST_FIELDS = f'nextPageToken,items({FILE_FIELDS})'
+CHANGES_FIELDS = f'nextPageToken,newStartPageToken,items(fileId,deleted,file({FILE_FIELDS}))'
+
+# The size of each piece a download is streamed to the disk in, so large files never sit in memory all at once
+DOWNLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+# How many files are downloaded or uploaded at the same time when pulling or pushing a whole folder
+DOWNLOAD_WORKERS = 16
+UPLOAD_WORKERS = 8
+
+# The most requests the Drive API will accept in a single batched HTTP request
+BATCH_REQUEST_LIMIT = 100
+
+# Where the manifest is saved between sessions, bump the version whenever the shape of the saved files changes so that
+# old caches are ignored, and the age after which we query everything again instead of only the changes since
+MANIFEST_CACHE_VERSION = 1
+MANIFEST_CACHE_FILE = Path.home() / '.cache' / 'google-drive-cli' / f'manifest.v{MANIFEST_CACHE_VERSION}.json'
+MANIFEST_CACHE_TTL = 24 * 60 * 60
+
+
+@lru_cache(maxsize=4096)
+def pretty_date(timestamp: str) -> str:
+    """Turns an RFC 3339 timestamp from the Drive API into a readable date, cached as the same dates are shown often"""
+
+    return timestamp.partition('.')[0].replace('T', ' ', 1)
+
+
+class FileManifest(dict):
+    """A dictionary linking file ids to their GoogleDriveFile that also keeps lookup indexes over those files"""
+
+    def __init__(self, files: Iterable[GoogleDriveFile] = ()) -> None:
+        super(FileManifest, self).__init__()
+
+        # Link every title and parent id to the ids of the files with that title or parent, and remember what each file
+        # was indexed under so we can still un-index it after its metadata is changed in place
+        self.ids_by_title = defaultdict(set)
+        self.ids_by_parent = defaultdict(set)
+        self.indexed_keys = dict()
+
+        # Keep the ids of all starred files as well so listings can be narrowed to them without looking at every file
+        self.starred_ids = set()
+
+        # Also link every pair of adjacent characters to the distinct titles that contain it for substring search, and
+        # every distinct title to its normalized form for fuzzy search
+        self.titles_by_bigram = defaultdict(set)
+        self.normalized_titles = dict()
+
+        for file in files:
+            self.add(file)
+
+    def add(self, file: GoogleDriveFile) -> None:
+        """Adds a file to the manifest and its indexes, re-indexing it if the file was already present"""
+
+        self.remove(file['id'])
+
+        parent_ids = tuple(parent['id'] for parent in file['parents'])
+
+        # Titles are only added to the bigram index and normalized the first time we see them
+        if file['title'] not in self.ids_by_title:
+
+            for bigram in self.bigrams(file['title']):
+                self.titles_by_bigram[bigram].add(file['title'])
+
+            self.normalized_titles[file['title']] = utils.default_process(file['title'])
+
+        self[file['id']] = file
+        self.ids_by_title[file['title']].add(file['id'])
+        self.indexed_keys[file['id']] = (file['title'], parent_ids)
+
+        for parent_id in parent_ids:
+            self.ids_by_parent[parent_id].add(file['id'])
+
+        if file['labels']['starred']:
+            self.starred_ids.add(file['id'])
+
+    def remove(self, file_id: str) -> None:
+        """Removes a file from the manifest and its indexes given its file id, does nothing if it is not present"""
+
+        if self.pop(file_id, None) is not None:
+
+            title, parent_ids = self.indexed_keys.pop(file_id)
+            self.discard_index_entry(self.ids_by_title, title, file_id)
+
+            for parent_id in parent_ids:
+                self.discard_index_entry(self.ids_by_parent, parent_id, file_id)
+
+            self.starred_ids.discard(file_id)
+
+            # Titles are only dropped from the bigram index and normalized titles once no file has them anymore
+            if title not in self.ids_by_title:
+
+                for bigram in self.bigrams(title):
+                    self.discard_index_entry(self.titles_by_bigram, bigram, title)
+
+                del self.normalized_titles[title]
+
+    @staticmethod
+    def bigrams(text: str) -> set:
+        """Returns the set of every pair of adjacent characters in the given text"""
+
+        return {text[idx:idx + 2] for idx in range(len(text) - 1)}
+
+    @staticmethod
+    def discard_index_entry(index: Dict[str, set], key: str, value: str) -> None:
+        """Removes a value from a single index entry, dropping the entry altogether once it is empty"""
+
+        index[key].discard(value)
+
+        if not index[key]:
+            del index[key]
+
+    def child_ids_with_title(self, parent_id: str, title: str) -> set:
+        """Returns the ids of all files in the manifest with the given parent and exactly the given title"""
+
+        # Intersecting the two indexes means we never look at every child of the parent
+        return self.ids_by_parent.get(parent_id, set()) & self.ids_by_title.get(title, set())
+
+    def titles_possibly_containing(self, text: str) -> List[str]:
+        """
+        Returns the distinct titles in the manifest that could contain the given text as a substring. Any title that
+        contains the text must also contain every pair of adjacent characters in it, so intersecting those entries of
+        the bigram index narrows the candidates down without looking at every title. The candidates still need to be
+        checked with an actual substring test.
+
+        Parameters:
+            text (str): The text we are searching the titles for
+
+        Returns:
+            A list of all distinct titles in the manifest that may contain the text
+        """
+
+        # Text that is too short to have any pairs of characters could be in any title
+        if len(text) < 2:
+            return list(self.ids_by_title)
+
+        # Intersect the smallest entries first so the working set is as small as possible from the start
+        entries = sorted((self.titles_by_bigram.get(bigram, set()) for bigram in self.bigrams(text)), key=len)
+        return list(set.intersection(*entries))
+
+    def files_titled(self, title: str) -> List[GoogleDriveFile]:
+        """Returns all of the files in the manifest with exactly the given title"""
+
+        return [self[file_id] for file_id in self.ids_by_title.get(title, ())]
+
+    def all_paths(self, root_id: str) -> Dict[str, List[str]]:
+        """
+        Works out every absolute path to every file in the manifest in one pass down from the root, following the parent
+        index breadth first. A file is only passed on to its own children once the paths through all of its parents are
+        known, so a file with many parents gets a path through each of them.
+
+        Parameters:
+            root_id (str): The file id of the drive root
+
+        Returns:
+            A dictionary linking file ids to a list of every absolute POSIX path to that file
+        """
+
+        # The root is simply the root character in POSIX paths, and parents we do not have are treated as the root too
+        paths = {parent_id: ['/'] for parent_id in self.ids_by_parent if parent_id not in self}
+        paths[root_id] = ['/']
+
+        unvisited_parents = {file_id: len(set(parent_ids)) for file_id, (_, parent_ids) in self.indexed_keys.items()}
+
+        # Files without any parents have no paths at all but their children still need to hear that from them
+        paths.update((file_id, []) for file_id, num_parents in unvisited_parents.items() if not num_parents)
+        to_visit = deque(paths)
+
+        while to_visit:
+
+            parent_id = to_visit.popleft()
+
+            # Extend the paths of every child through this parent and visit the child once all its parents are done
+            for child_id in self.ids_by_parent.get(parent_id, ()):
+
+                title = self.indexed_keys[child_id][0]
+                paths.setdefault(child_id, []).extend(PurePosixPath(parent_path, title).as_posix()
+                                                      for parent_path in paths[parent_id])
+
+                unvisited_parents[child_id] -= 1
+
+                if not unvisited_parents[child_id]:
+                    to_visit.append(child_id)
+
+        return paths
+
+    def children_of(self, parent_id: str, starred_only=False) -> List[GoogleDriveFile]:
+        """Returns all of the files in the manifest with the given file id in their parents, or only the starred ones"""
+
+        child_ids = self.ids_by_parent.get(parent_id, set())
+        return [self[file_id] for file_id in (child_ids & self.starred_ids if starred_only else child_ids)]
 
 
 class RemoteDriveInterface:
@@ -41,21 +253,269 @@ class RemoteDriveInterface:
         # Create and authenticate the user
         self.auth = GoogleAuth(settings_file='config/settings.yaml')
 
-        # Then create a new google drive instance and cache all of the files in the drive
+        # Then create a new google drive instance, the file listings are only queried the first time they are needed
         self.drive = GoogleDrive(self.auth)
-        self.files = {file['id']: file for file in self.drive.ListFile({'q': "trashed=false"}).GetList()}
-        self.trash = {file['id']: file for file in self.drive.ListFile({'q': "trashed=true"}).GetList()}
+        self._files, self._trash = None, None
+
+        # The token to query the remote changes since the listings were fetched and when they were fully fetched
+        self.change_token, self.fetched_at = None, None
+
+        # Every path to a cached file that we have already worked out, kept until the cached files change
+        self.path_cache = dict()
+
+        # The path lookups remembered for the command that is currently running, if it asked us to remember them
+        self.lookup_cache = None
+
+        # Parallel uploads update the cached listings from many threads so those updates must take turns
+        self.cache_lock = threading.RLock()
+
+        # Finally try to start from the listings saved by a previous session
+        self.load_cached_manifest()
+
+    @property
+    def files(self) -> FileManifest:
+        """All of the non-trashed files in the drive keyed by their id, queried from the API on first access"""
+
+        if self._files is None:
+            self._files = self.query_file_manifest(trashed=False)
+            self.save_cached_manifest()
+
+        return self._files
+
+    @property
+    def trash(self) -> FileManifest:
+        """All of the trashed files in the drive keyed by their id, queried from the API on first access"""
+
+        if self._trash is None:
+            self._trash = self.query_file_manifest(trashed=True)
+            self.save_cached_manifest()
+
+        return self._trash
+
+    def authorize(self) -> None:
+        """
+        Makes sure the user is logged in and the raw API service is built. pydrive2 only does this inside its own
+        decorated calls so we do it the same way those calls do before touching the service ourselves. This should
+        first be called from the main thread so the user is never asked to log in from two threads at once.
+        """
+
+        # Log in again if the access token is missing or has expired, then build the service if it was never built
+        if self.auth.access_token_expired:
+            if getattr(self.auth, 'auth_method', False) == 'service':
+                self.auth.ServiceAuth()
+            else:
+                self.auth.LocalWebserverAuth()
+
+        if self.auth.service is None:
+            self.auth.Authorize()
+
+    @property
+    def service(self):
+        """The raw Google Drive API service for the requests pydrive2 has no wrapper for, authorized before use"""
+
+        self.authorize()
+        return self.auth.service
+
+    @cached_property
+    def drive_root(self) -> Dict:
+        """The parent reference of the root of this google drive - root is not considered a normal file"""
+
+        # The API accepts the alias 'root' in place of a file id so one small metadata request gives us the real id
+        root = self.drive.CreateFile({'id': 'root'})
+        root.FetchMetadata(fields='id')
+
+        return {'id': root['id'], 'isRoot': True}
+
+    def query_file_manifest(self, trashed=False) -> FileManifest:
+        """
+        Queries the API for every file in the drive that is either trashed or not trashed and returns them in a
+        manifest keyed by their file ids.
+
+        Parameters:
+            trashed (bool): Lets us know if we want to query the files in the trash or the non-trashed files
+
+        Returns:
+            A FileManifest linking all file ids to their corresponding GoogleDriveFile
+        """
+
+        self.query_change_token()
+
+        # Iterate over the listing a page at a time so each page is indexed as it arrives instead of buffering them all
+        query = {'q': 'trashed=true' if trashed else 'trashed=false', 'fields': MANIFEST_FIELDS, 'maxResults': 1000}
+        return FileManifest(file for page in self.drive.ListFile(query) for file in page)
+
+    def query_change_token(self) -> None:
+        """Remembers where the remote change history stands, if we are not already tracking it, before any listing"""
+
+        # Taking the token before listing anything means no change can slip in between the two
+        if self.change_token is None:
+            self.change_token = self.service.changes().getStartPageToken().execute()['startPageToken']
+            self.fetched_at = time.time()
+
+    def load_file_manifests(self) -> None:
+        """
+        Makes sure both the files and the trash listings are loaded. If neither has been queried yet then they are two
+        independent requests to the API so we query them concurrently instead of one after the other, otherwise the
+        missing listing is just queried lazily as normal.
+        """
 
-        # Finally we need to find the root of this google drive so we first need to get all parent references - root is
-        # not considered a normal file
-        all_parents = [parent for file in self.files.values() for parent in file['parents']]
-        self.drive_root = [parent for parent in all_parents if parent['isRoot']].pop()
+        if self._files is None and self._trash is None:
+
+            # Authorize and take the change token up front so the two queries dont both try to do either at once
+            self.authorize()
+            self.query_change_token()
+
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                self._files, self._trash = executor.map(self.query_file_manifest, (False, True))
+
+            self.save_cached_manifest()
 
     def update_file_manifest(self) -> None:
-        """Updates the local file cache with all remote files. Just queries the API to get the files listings"""
+        """Marks the local file cache as stale so the file listings are lazily re-queried the next time they are used"""
+
+        self._files, self._trash = None, None
+        self.change_token, self.fetched_at = None, None
+        self.forget_lookups()
+
+    def load_cached_manifest(self) -> None:
+        """
+        Loads the file listings saved to the disk by a previous session, provided they were saved by this version of
+        the program and are not older than MANIFEST_CACHE_TTL, and then brings them up to date by applying only the
+        changes made on the remote server since they were saved rather than querying every file again.
+        """
+
+        try:
+            with open(MANIFEST_CACHE_FILE, 'r') as cache_file:
+                cache = json.load(cache_file)
+
+            if cache['version'] != MANIFEST_CACHE_VERSION or time.time() - cache['fetched_at'] > MANIFEST_CACHE_TTL:
+                return
+
+            # Rebuild the GoogleDriveFiles from their saved metadata for whichever listings had been queried
+            listings = {
+                listing: None if cache[listing] is None else FileManifest(
+                    GoogleDriveFile(auth=self.auth, metadata=file, uploaded=True) for file in cache[listing]
+                ) for listing in ('files', 'trash')
+            }
+
+            change_token, fetched_at = cache['change_token'], cache['fetched_at']
+
+        # If there is no usable cache on the disk, be it missing, unreadable or malformed, then the listings will simply
+        # be queried when they are first needed
+        except (OSError, ValueError, KeyError, TypeError):
+            return
+
+        self._files, self._trash = listings['files'], listings['trash']
+        self.change_token, self.fetched_at = change_token, fetched_at
+
+        # If we cannot catch up on the remote changes, say we are offline, the token has expired or we can no longer log
+        # in, then the saved listings cannot be trusted and are simply queried again when they are first needed
+        try:
+            self.apply_remote_changes()
+        except (HttpError, HttpLib2Error, OSError, AuthError, AccessTokenRefreshError):
+            self.update_file_manifest()
+            return
+
+        self.save_cached_manifest()
+
+    def save_cached_manifest(self) -> None:
+        """Saves whichever file listings have been queried to the disk so the next session can start from them"""
+
+        cache = {
+            'version': MANIFEST_CACHE_VERSION,
+            'fetched_at': self.fetched_at,
+            'change_token': self.change_token,
+            'files': None if self._files is None else list(self._files.values()),
+            'trash': None if self._trash is None else list(self._trash.values()),
+        }
+
+        # Write to a temporary file first so an interrupted save never leaves a half written cache behind. The cache
+        # lists every file in the drive so only the owner may read it, and the file is recreated to get those rights
+        MANIFEST_CACHE_FILE.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        temporary_file = MANIFEST_CACHE_FILE.with_suffix('.tmp')
+        temporary_file.unlink(missing_ok=True)
+
+        with os.fdopen(os.open(temporary_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), 'w') as cache_file:
+            json.dump(cache, cache_file)
+
+        temporary_file.replace(MANIFEST_CACHE_FILE)
+
+    def apply_remote_changes(self) -> None:
+        """
+        Applies every change made on the remote server since our change token to the loaded file listings. Each change
+        carries the current state of the file so replaying changes we have already seen is harmless.
+        """
+
+        changes, page_token = self.service.changes(), self.change_token
+
+        while page_token:
+
+            response = changes.list(pageToken=page_token, includeDeleted=True, fields=CHANGES_FIELDS).execute()
+
+            # Files that were deleted forever are dropped otherwise the new state of the file replaces the cached one
+            for change in response['items']:
+                if change['deleted'] or 'file' not in change:
+                    self.uncache_file(change['fileId'])
+                else:
+                    file = GoogleDriveFile(auth=self.auth, metadata=change['file'], uploaded=True)
+                    self.cache_file(file, trashed=file['labels']['trashed'])
+
+            # The final page of changes gives us the token to continue from next time
+            page_token = response.get('nextPageToken')
+            self.change_token = response.get('newStartPageToken', self.change_token)
+
+    def cache_file(self, file: GoogleDriveFile, trashed=False) -> None:
+        """
+        Adds a single file to the local file cache, or moves it between the files and the trash, so that a mutation
+        does not need to re-query the whole manifest. Listings that have not been queried yet are left alone as they
+        will include the file once they are.
+
+        Parameters:
+            file (GoogleDriveFile): The file that was created or changed on the remote server
+            trashed (bool): Lets us know if the file now lives in the trash
+        """
+
+        with self.cache_lock:
+
+            self.uncache_file(file['id'])
+            self.forget_lookups()
 
-        self.files = {file['id']: file for file in self.drive.ListFile({'q': "trashed=false"}).GetList()}
-        self.trash = {file['id']: file for file in self.drive.ListFile({'q': "trashed=true"}).GetList()}
+            if (listing := self._trash if trashed else self._files) is not None:
+                listing.add(file)
+
+    def uncache_file(self, file_id: str) -> None:
+        """Removes a single file from the local file cache given its file id, used when a file is deleted forever"""
+
+        with self.cache_lock:
+
+            for listing in (self._files, self._trash):
+                if listing is not None:
+                    listing.remove(file_id)
+
+            self.forget_lookups()
+
+    @contextmanager
+    def request_cache(self):
+        """
+        Remembers the result of every path lookup for as long as the context is open, which is meant to be a single
+        command. Looking up the same path again within that command is then free and never asks the user to resolve
+        the same name conflict twice.
+        """
+
+        self.lookup_cache = dict()
+
+        try:
+            yield
+        finally:
+            self.lookup_cache = None
+
+    def forget_lookups(self) -> None:
+        """Forgets the remembered paths and lookups, used whenever the cached files change as they may now be wrong"""
+
+        self.path_cache.clear()
+
+        if self.lookup_cache is not None:
+            self.lookup_cache.clear()
 
     @staticmethod
     def resolve_mnemonic_conflict(matching_filenames: List[GoogleDriveFile]) -> GoogleDriveFile:
@@ -72,8 +532,9 @@ class RemoteDriveInterface:
             file_ids[response] (GoogleDriveFile): The GoogleDriveFile whose ID was entered by the user when prompted
         """
 
-        # Cache a dictionary linking all file ids to their corresponding file objects
+        # Cache a dictionary linking all file ids to their corresponding file objects and the pretty modified dates
         file_ids = {file['id']: file for file in matching_filenames}
+        pretty_dates = [pretty_date(file['modifiedDate']) for file in matching_filenames]
 
         while 1:
 
@@ -81,10 +542,9 @@ class RemoteDriveInterface:
             print_formatted_text(ANSI("\x1b[31mThere are multiple files with the same filename given!\n"))
 
             # Until the user provides the info we want keep printing the matching files
-            for file in matching_filenames:
-                pretty_date = file['modifiedDate'][:file['modifiedDate'].index('.')].replace('T', ' ')
+            for file, modified in zip(matching_filenames, pretty_dates):
                 print_formatted_text(ANSI(f"\x1b[36mDisplay Name: \x1b[37m{file['title']} \x1b[36mLast Modified: "
-                                          f"\x1b[37m{pretty_date} \x1b[36mFile ID: \x1b[37m{file['id']}"))
+                                          f"\x1b[37m{modified} \x1b[36mFile ID: \x1b[37m{file['id']}"))
 
             # Newline for terminal readability and prompt the user to resolve the conflict
             print_formatted_text("")
@@ -108,12 +568,13 @@ class RemoteDriveInterface:
             conversion_opts[user_input] (str): The file extension we are converting this file to
         """
 
+        # Cache the supported conversions list for this file once as it does not change between attempts
+        conversion_opts = [ext for ext, link in SUPPORTED_FILE_TYPES.items() if link in remote_file['exportLinks']]
+
         while 1:
 
-            # Print the helpful prompt on what the user is choosing and cache the supported conversions list for this
-            # file
+            # Print the helpful prompt on what the user is choosing
             print_formatted_text(ANSI(f"\x1b[36mWhat file type would you like to convert \"{remote_file['title']}\" to?"))
-            conversion_opts = [ext for ext, link in SUPPORTED_FILE_TYPES.items() if link in remote_file['exportLinks']]
 
             # Print out all of the possible conversion's for this document and their associated number
             for choice, conversion in enumerate(conversion_opts):
@@ -131,43 +592,28 @@ class RemoteDriveInterface:
             except ValueError:
                 print_formatted_text(ANSI('\x1b[31mPlease input the integer that corresponds to your desired file type'))
 
-    def validate_remote_path(self, file: GoogleDriveFile, remote_path: str, search_trash=False) -> bool:
+    def get_remote_file(self, filename: str, trashed=False) -> GoogleDriveFile:
         """
-        Given a valid remote GoogleDriveFile and a semantic file path validate that using this path we could access
-        this same file and if we can then return true however if this file path cannot lead us to the given file file
-        then return false
+        Looks up a remote file by its path just like find_remote_file, but while a request cache is open the result is
+        remembered and any later lookup of the same path in the same listing is answered from it.
 
         Parameters:
-            file (GoogleDriveFile): The GoogleDriveFile we are starting from to validate the path
-            remote_path (str): The absolute path to the file that we are trying to validate
-            search_trash (bool): Lets us know if we want to search for trashed files when validating this path
+            filename (str): The absolute remote path of the file we are searching for
+            trashed (bool): Lets us know if we want to search the trash for this file
 
         Returns:
-            A boolean to let us know if the given remote path is valid or not
+            Either a GoogleDriveFile if one was found that matches or None if no file matched the query
         """
 
-        # Get all the files to check against, the parent ids of the file, and create a new path 
-        files_to_search = list(self.files.values()) + list(self.trash.values()) if search_trash else self.files.values()
-        parent_ids = [parent['id'] for parent in file['parents']]
-        to_validate = Path(remote_path)
-
-        # If the title of the file is not the same as the last part of the given path then it is trivially false
-        if file['title'] != to_validate.name:
-            return False
+        if self.lookup_cache is None:
+            return self.find_remote_file(filename, trashed)
 
-        # If the file name matches the file path and the root node is a parent then it is trivially true
-        elif self.drive_root['id'] in parent_ids:
-            return True
+        if (key := (PurePosixPath(filename), trashed)) not in self.lookup_cache:
+            self.lookup_cache[key] = self.find_remote_file(filename, trashed)
 
-        # We need to investigate further, look at all files and see if their id matches a parent and attempt to
-        # validate them too if non validate correctly then return false
-        for check in files_to_search:
-            if check['id'] in parent_ids and self.validate_remote_path(check, to_validate.parent, search_trash=search_trash):
-                return True
+        return self.lookup_cache[key]
 
-        return False
-
-    def get_remote_file(self, filename: str, trashed=False) -> GoogleDriveFile:
+    def find_remote_file(self, filename: str, trashed=False) -> GoogleDriveFile:
         """
         Using a given file path search the Google Drive instance for any files matching that name and file path. If
         there are many instances of a files that match the given file path and name then prompt the user to specify
@@ -181,48 +627,121 @@ class RemoteDriveInterface:
             Either a GoogleDriveFile if one was found that matches or None if no file matched the query
         """
 
-        # Convert the filename to a file path for easier manipulation and create a list of matching file names
-        files_to_check = self.trash.values() if trashed else self.files.values()
-        full_path, matching_files = Path(filename), list()
+        # If we are searching the trash then the path may run through both listings so make sure they are loaded
+        if trashed:
+            self.load_file_manifests()
+
+        # Convert the filename to a file path for easier manipulation and get the listings the path can run through
+        files_to_check = self.trash if trashed else self.files
+        listings = (self.files, self.trash) if trashed else (self.files,)
+        full_path = PurePosixPath(filename)
 
         # Make sure that the file path is not the root before continuing
         if not full_path.name:
             return self.drive_root
 
-        # Look over all files and if their filename matches the given one then validate that their full paths match
-        for file in files_to_check:
-            if file['title'] == full_path.name and self.validate_remote_path(file, full_path, search_trash=trashed):
-                matching_files.append(file)
+        # Walk down from the root one path segment at a time, keeping the ids of every file that matches the path so far,
+        # so each step only looks at the children of the folders we have already matched
+        matching_ids = {self.drive_root['id']}
+
+        for segment in full_path.parts[1:] if full_path.is_absolute() else full_path.parts:
+            matching_ids = {file_id for parent_id in matching_ids for listing in listings
+                            for file_id in listing.child_ids_with_title(parent_id, segment)}
+
+        # Only the files that live in the listing we are searching can be a match for the full path
+        matching_files = [files_to_check[file_id] for file_id in matching_ids if file_id in files_to_check]
 
         # If we match any files then we definitely found a file but may need to resolve a same name issue with user
         if num_matches := len(matching_files):
             return matching_files.pop() if num_matches == 1 else self.resolve_mnemonic_conflict(matching_files)
 
-    def get_object_children(self, parent=None, trashed=False) -> List[GoogleDriveFile]:
+    def get_child_file(self, parent: GoogleDriveFile, title: str) -> GoogleDriveFile:
+        """
+        Finds the file with the given title directly inside a remote folder we already hold, which saves walking the
+        whole path down from the root again. Just like get_remote_file the user is asked to pick a file if many match.
+
+        Parameters:
+            parent (GoogleDriveFile): The remote folder to look in
+            title (str): The exact title of the file we are looking for
+
+        Returns:
+            Either a GoogleDriveFile if one was found that matches or None if no file matched the query
+        """
+
+        matching_files = [self.files[file_id] for file_id in self.files.child_ids_with_title(parent['id'], title)]
+
+        if num_matches := len(matching_files):
+            return matching_files.pop() if num_matches == 1 else self.resolve_mnemonic_conflict(matching_files)
+
+    def get_file_paths(self, remote_file: GoogleDriveFile) -> List[str]:
         """
-        Given a parent GoogleDriveFile return a list of all files who have that file in their parents list. This isn't
-        particularly complex we just go over every file and add it to children if one of their parent ids is the id
-        of the parent we were given. One important not is that if no parent is specified then the Google Drive root
-        file will be used as a default.
+        Returns every absolute path to a file in the cached file listing, a file with many parents has a path through
+        each of them. The paths of all cached files are worked out together in a single pass the first time any are
+        needed and are kept until the cached files change, so every other call is just a lookup.
 
         Parameters:
-            parent (GoogleDriveFile): The parent to the google drive file we are searching for; defaults to root
+            remote_file (GoogleDriveFile): The cached file we want the paths to
+
+        Returns:
+            A list of every absolute POSIX path to the given file
+        """
+
+        if not self.path_cache:
+            self.path_cache.update(self.files.all_paths(self.drive_root['id']))
+
+        return self.path_cache.get(remote_file['id'], [])
+
+    def get_object_children(self, parent=None, trashed=False, starred_only=False) -> List[GoogleDriveFile]:
+        """
+        Given the file id of a parent GoogleDriveFile return a list of all files who have that file in their parents
+        list. This is a single lookup in the parent index of the file manifest rather than a scan over every file. One
+        important note is that if no parent is specified then the Google Drive root file will be used as a default.
+
+        Parameters:
+            parent (str): The file id of the parent to the google drive files we are searching for; defaults to root
             trashed (bool): Lets us know if we want to search the trash for children as well
+            starred_only (bool): Lets us know if we only want the children that are starred
         """
 
-        # Get the files to search, the parent id, and create the list of children
-        files_to_check = list(self.trash.values()) + list(self.files.values()) if trashed else self.files.values()
+        # If we are searching the trash as well then make sure both listings are loaded
+        if trashed:
+            self.load_file_manifests()
+
+        # Get the parent id and look up its children, including the trashed ones if asked
         parent = parent if parent is not None else self.drive_root['id']
-        children = list()
+        children = self.files.children_of(parent, starred_only)
+
+        return self.trash.children_of(parent, starred_only) + children if trashed else children
+
+    @staticmethod
+    def contents_match(local_path: str, remote_file: GoogleDriveFile) -> bool:
+        """
+        Checks if the contents of a local file are identical to those of a remote file without downloading anything.
+        Google Drive already stores the size and MD5 checksum of every non proprietary file so we first compare the
+        sizes, which is free, and only hash the local file if those are the same.
+
+        Parameters:
+            local_path (str): The absolute path to the local file we are comparing
+            remote_file (GoogleDriveFile): The remote file we are comparing the local file against
+
+        Returns:
+            A boolean to let us know if the local and remote file contents are identical
+        """
 
-        # Go over every file and see if the parents of that file contain the given node
-        for file in files_to_check:
-            if parent in map(lambda file_parents: file_parents['id'], file['parents']):
-                children.append(file)
+        # Proprietary google files have no size or checksum so they can never be considered identical
+        if 'md5Checksum' not in remote_file or int(remote_file['fileSize']) != Path(local_path).stat().st_size:
+            return False
+
+        # Hash the local file in chunks so that large files are never fully read into memory
+        local_hash = hashlib.md5()
+
+        with open(local_path, 'rb') as local_file:
+            for chunk in iter(lambda: local_file.read(1024 * 1024), b''):
+                local_hash.update(chunk)
 
-        return children
+        return local_hash.hexdigest() == remote_file['md5Checksum']
 
-    def create_file(self, local_path: str, remote_path: str) -> None:
+    def create_file(self, local_path: str, remote_path: str, parent: GoogleDriveFile = None) -> None:
         """
         Creates a new file in the remote Google Drive server specified by remote_path and will upload the contents of
         local_path into the file. It is important to note that local_path must be a file or else this wont work.
@@ -230,109 +749,299 @@ class RemoteDriveInterface:
         Parameters:
             local_path (str): The absolute path to the local file we are uploading to the Google Drive
             remote_path (str): The absolute path to the remote file we are creating
+            parent (GoogleDriveFile): The remote folder the file goes in, if the caller already has it on hand
+        """
+
+        self.upload_file(self.prepare_upload(remote_path, parent), local_path)
+
+    def create_files(self, uploads: List[Tuple[Path, PurePosixPath]], parent: GoogleDriveFile) -> None:
+        """
+        Uploads many local files into the same remote folder at the same time. Everything that might need to ask the
+        user a question is settled up front, one file at a time, so that only the uploads themselves run in parallel
+        and prompts are never interleaved.
+
+        Parameters:
+            uploads (List[Tuple[Path, PurePosixPath]]): Pairs of the local file and the remote path to upload it to
+            parent (GoogleDriveFile): The remote folder all of the files go in
+        """
+
+        jobs = [(self.prepare_upload(remote_path, parent), local_path) for local_path, remote_path in uploads]
+
+        # pydrive2 gives every thread its own http object so the uploads can safely share the pool
+        with ThreadPoolExecutor(UPLOAD_WORKERS) as executor:
+            list(executor.map(lambda job: self.upload_file(*job), jobs))
+
+    def prepare_upload(self, remote_path: str, parent: GoogleDriveFile = None) -> GoogleDriveFile:
+        """
+        Finds the remote file a local file should be uploaded into, which is either the file already at remote_path or
+        a new file object in its parent folder, creating that folder first if it is missing.
+
+        Parameters:
+            remote_path (str): The absolute path to the remote file we are uploading to
+            parent (GoogleDriveFile): The remote folder the file goes in, if the caller already has it on hand
+
+        Returns:
+            The existing remote file or a new file object that has not been uploaded yet
         """
 
         # Get the full path and the parent of the full path before starting
-        full_path = Path(remote_path)
+        full_path = PurePosixPath(remote_path)
 
-        # If the file is not already present in the drive then create a new file and if it is then update it
-        if not (duplicate := self.get_remote_file(remote_path)):
+        # If we were handed the parent folder then we only need to look inside it rather than walking the whole path
+        duplicate = self.get_remote_file(remote_path) if parent is None else self.get_child_file(parent, full_path.name)
 
-            parent = self.create_file_path(full_path.parent)
+        # If the file is already present in the drive then we update it otherwise we create a new file
+        if duplicate:
+            return duplicate
 
-            # If the parent of the current file is null then dont assign it a parent else give it the current parent
-            if parent is None:
-                file = self.drive.CreateFile({'title': full_path.name})
-            else:
-                file = self.drive.CreateFile({'title': full_path.name, 'parents': [{'id': parent['id']}]})
+        parent = parent or self.create_file_path(full_path.parent)
 
-        # Otherwise this file already exists in the remote drive so we need to update its contents
+        # If the parent of the current file is null then dont assign it a parent else give it the current parent
+        if parent is None:
+            return self.drive.CreateFile({'title': full_path.name})
         else:
-            file = duplicate
+            return self.drive.CreateFile({'title': full_path.name, 'parents': [{'id': parent['id']}]})
+
+    def upload_file(self, file: GoogleDriveFile, local_path: str) -> None:
+        """
+        Uploads the contents of a local file into a remote file, skipping the upload if the remote file already exists
+        with the same contents. This never asks the user anything so it is safe to run on many threads at once.
+
+        Parameters:
+            file (GoogleDriveFile): The remote file to upload into, as given by prepare_upload
+            local_path (str): The absolute path to the local file we are uploading to the Google Drive
+        """
+
+        # If the file already exists with the same contents as the local file then there is nothing to upload
+        if file.get('id') and self.contents_match(local_path, file):
+            return
 
-        # Upload the contents of the local file to the remote file 
-        file.SetContentFile(local_path)
+        # Upload the contents of the local file to the remote file
+        file.SetContentFile(str(local_path))
         file.Upload()
 
         # Update our local cache to reflect this change
-        self.update_file_manifest()
+        self.cache_file(file)
 
-    def create_file_path(self, directory_path: str, recursed=False) -> GoogleDriveFile:
+    def create_file_path(self, directory_path: str) -> GoogleDriveFile:
         """
         Creates a new folder in the remote Google Drive instance. Will also create parent directories if we are asked
-        to make a subdirectory that doesnt currently exist
+        to make a subdirectory that doesnt currently exist. This happens in two phases, first we walk down the path to
+        find the deepest folder that already exists using only the cached file manifest and then we create all of the
+        missing folders beneath it in order.
 
         Parameters:
             directory_path (str): The absolute file path we are creating
-            recursed (bool): Lets us know whether we have recursed or not so we dont have too many api calls
 
         Returns:
-            parent (GoogleDriveFile): Returns the most recent GoogleDriveFile created
+            parent (GoogleDriveFile): Returns the most recent GoogleDriveFile created or None for the drive root
         """
 
-        full_path = Path(directory_path)    # Create a path object for easy manipulations
+        full_path = PurePosixPath(directory_path)    # Create a path object for easy manipulations
+        parent, missing_folders = None, list()
 
-        if full_path.name:
+        # Most of the time the whole directory chain already exists so check for that with a single lookup first
+        if folder := self.get_remote_file(full_path):
+            return folder
+
+        # Walk down the path from the root until we find the first folder that does not exist yet, everything after it
+        # must be missing as well so we dont need to look those up
+        for depth, folder_name in enumerate(full_path.parts[1:], start=2):
+            if missing_folders or not (folder := self.get_remote_file(PurePosixPath(*full_path.parts[:depth]))):
+                missing_folders.append(folder_name)
+            else:
+                parent = folder
 
-            # Assuming the path is valid then create the full path to place this file
-            parent = self.create_file_path(full_path.parent, recursed=True)
+        # Then create all of the missing folders in order, each one being the parent of the next
+        for folder_name in missing_folders:
 
             # Standard options for creating a new folder in google drive
-            file_options = {'title': full_path.name, 'mimeType': 'application/vnd.google-apps.folder'}
+            file_options = {'title': folder_name, 'mimeType': FOLDER_MIME_TYPE}
 
             # If the parent is not None then this folder needs a parent
             if parent is not None:
                 file_options['parents'] = [{'id': parent['id']}]
 
-            # Check if a folder already exists before creating another one
-            if not (duplicate := self.get_remote_file(full_path)):
-                folder = self.drive.CreateFile(file_options)
-                folder.Upload()
+            parent = self.drive.CreateFile(file_options)
+            parent.Upload()
 
-            # Only update the file manifest at the very end
-            if not recursed:
-                self.update_file_manifest()
+            # Update our local cache to reflect this change
+            self.cache_file(parent)
 
-            # Return the newly created folder if it was a new creation otherwise return the preexisting folder
-            return folder if not duplicate else duplicate
+        return parent
 
-    def download_file(self, remote_path: Path, local_path: Path) -> None:
+    def batch_execute(self, requests: List, on_response: Callable[[int, Dict], None] = None) -> List[Dict]:
+        """
+        Executes many independent Drive API requests using as few HTTP round trips as possible by sending them in
+        batches. The server may run the requests of a batch in any order, so they must not depend on one another. If
+        any request fails the first error is raised once every batch has run, so on_response can be given to act on
+        each successful response as it arrives even when others fail.
+
+        Parameters:
+            requests (List): The unexecuted API requests to send to the server
+            on_response (Callable[[int, Dict], None]): Called with the index and response of every successful request
+
+        Returns:
+            responses (List[Dict]): The response of each request in the same order the requests were given
+        """
+
+        responses, errors = [None] * len(requests), list()
+
+        def store_response(request_id, response, exception):
+            if exception is not None:
+                errors.append(exception)
+            else:
+                responses[int(request_id)] = response
+                if on_response is not None:
+                    on_response(int(request_id), response)
+
+        for start in range(0, len(requests), BATCH_REQUEST_LIMIT):
+
+            batch = self.service.new_batch_http_request(callback=store_response)
+
+            for index, request in enumerate(requests[start:start + BATCH_REQUEST_LIMIT], start=start):
+                batch.add(request, request_id=str(index))
+
+            batch.execute()
+
+        # Only raise once every batch has run so that we never leave a batch half sent, wrapping API errors the same
+        # way pydrive2 does for its own requests
+        if errors:
+            raise ApiRequestError(errors[0]) if isinstance(errors[0], HttpError) else errors[0]
+
+        return responses
+
+    def insert_permissions(self, remote_file: GoogleDriveFile, permissions: List[Dict]) -> None:
+        """
+        Adds many sharing permissions to a remote file with a single batched request rather than one per permission.
+
+        Parameters:
+            remote_file (GoogleDriveFile): The remote file we are sharing
+            permissions (List[Dict]): The permission resources to add to the file
+        """
+
+        permission_api = self.service.permissions()
+        self.batch_execute([permission_api.insert(fileId=remote_file['id'], body=permission)
+                            for permission in permissions])
+
+    def delete_permissions(self, remote_file: GoogleDriveFile, permission_ids: List[str]) -> None:
+        """
+        Removes many sharing permissions from a remote file with one batched request rather than one per permission.
+
+        Parameters:
+            remote_file (GoogleDriveFile): The remote file we are un-sharing
+            permission_ids (List[str]): The ids of the permissions to remove from the file
+        """
+
+        permission_api = self.service.permissions()
+        self.batch_execute([permission_api.delete(fileId=remote_file['id'], permissionId=permission_id)
+                            for permission_id in permission_ids])
+
+    def create_folders(self, parent: GoogleDriveFile, folder_names: List[str]) -> List[GoogleDriveFile]:
+        """
+        Creates many sibling folders in the same remote parent folder at once. Since none of the new folders depend on
+        each other they can all be created with a single batched request rather than one round trip per folder.
+
+        Parameters:
+            parent (GoogleDriveFile): The remote folder to create the new folders in
+            folder_names (List[str]): The names of all the folders we want to create
+
+        Returns:
+            folders (List[GoogleDriveFile]): The newly created remote folders
+        """
+
+        file_api = self.service.files()
+        requests = [
+            file_api.insert(fields=FILE_FIELDS, body={
+                'title': folder_name,
+                'mimeType': FOLDER_MIME_TYPE,
+                'parents': [{'id': parent['id']}]
+            }) for folder_name in folder_names
+        ]
+
+        folders = [None] * len(requests)
+
+        # Cache every folder as soon as the server creates it, so if another folder fails the ones that were created
+        # are still in our cache and a retry finds them rather than creating duplicates
+        def cache_folder(index, metadata):
+            folders[index] = GoogleDriveFile(auth=self.auth, metadata=metadata, uploaded=True)
+            self.cache_file(folders[index])
+
+        self.batch_execute(requests, on_response=cache_folder)
+        return folders
+
+    def download_file(self, remote_path: PurePosixPath, local_path: Path) -> None:
         """
         Creates a new local copy, with the path local_path, of the remote file remote_path. This function is a one to
         one download provided that the remote file exists. It will only every download the one remote file to the one
         local file.
 
         Parameters:
-            remote_path (Path): The absolute path to the remote file that we are attempting to download
+            remote_path (PurePosixPath): The absolute path to the remote file that we are attempting to download
             local_path (Path): The absolute path to the location on the local disk to store the file to
         """
 
         if remote_file := self.get_remote_file(str(remote_path)):
+            self.download_files([(remote_file, local_path)])
+        else:
+            raise RemotePathNotFound(remote_path)
 
-            parent_dir, path_suffix = local_path.parent, local_path.suffix
+    def download_files(self, downloads: List[Tuple[GoogleDriveFile, Path]]) -> None:
+        """
+        Downloads many remote files to the local disk at the same time. Everything that might need to ask the user a
+        question is settled up front, one file at a time, so that only the downloads themselves run in parallel and
+        prompts are never interleaved.
 
-            # If the remote files exists then make sure we have a local dir to read to
-            if not parent_dir.exists():
-                parent_dir.mkdir()
+        Parameters:
+            downloads (List[Tuple[GoogleDriveFile, Path]]): Pairs of the remote file and the local path to save it to
+        """
 
-            # If the remote file if not a proprietary google file then download normally otherwise we need to convert
-            if not remote_file['mimeType'].startswith('application/vnd.google-apps.'):
-                remote_file.GetContentFile(str(local_path))
+        # Drive allows siblings with the same title and those are all saved to the same local path, so the downloads
+        # are grouped by path. Each group runs one download after another in the given order so the last one wins
+        jobs_by_path = defaultdict(list)
 
-            else:
+        for remote_file, local_path in downloads:
+            path, mimetype = self.prepare_download(remote_file, local_path)
+            jobs_by_path[path].append((remote_file, path, mimetype))
 
-                # Get the suffix of the file and use that to decipher what conversion mimetype to use
-                if SUPPORTED_FILE_TYPES.get(path_suffix) in remote_file['exportLinks'].keys():
-                    file_suffix = path_suffix
-                else:
-                    file_suffix = self.resolve_file_conversion(remote_file)
-                    local_path = Path(str(local_path) + file_suffix)
+        def download_all(jobs):
+            for remote_file, path, mimetype in jobs:
+                remote_file.GetContentFile(str(path), mimetype=mimetype, chunksize=DOWNLOAD_CHUNK_SIZE)
+
+        # pydrive2 gives every thread its own http object so the different paths can safely share the pool
+        with ThreadPoolExecutor(DOWNLOAD_WORKERS) as executor:
+            list(executor.map(download_all, jobs_by_path.values()))
+
+    def prepare_download(self, remote_file: GoogleDriveFile, local_path: Path) -> Tuple[Path, Optional[str]]:
+        """
+        Makes sure we have a local directory to download a remote file to and works out what format to download it in,
+        asking the user for a format if it is a proprietary google file without a usable suffix.
+
+        Parameters:
+            remote_file (GoogleDriveFile): The remote file we are about to download
+            local_path (Path): The absolute path to the location on the local disk to store the file to
+
+        Returns:
+            The local path to download to and the mimetype to export to, which is None for regular files
+        """
+
+        path_suffix = local_path.suffix
+
+        # If the remote files exists then make sure we have a local dir to read to
+        local_path.parent.mkdir(parents=True, exist_ok=True)
 
-                # Once we have he mimetype then download the file with that specific mimetype
-                remote_file.GetContentFile(local_path, mimetype=SUPPORTED_FILE_TYPES[file_suffix])
+        # If the remote file if not a proprietary google file then download normally otherwise we need to convert
+        if not remote_file['mimeType'].startswith('application/vnd.google-apps.'):
+            return local_path, None
 
+        # Get the suffix of the file and use that to decipher what conversion mimetype to use
+        if SUPPORTED_FILE_TYPES.get(path_suffix) in remote_file['exportLinks']:
+            file_suffix = path_suffix
         else:
-            raise RemotePathNotFound(remote_path)
+            file_suffix = self.resolve_file_conversion(remote_file)
+            local_path = Path(str(local_path) + file_suffix)
+
+        return local_path, SUPPORTED_FILE_TYPES[file_suffix]
 
     def delete_remote_file(self, remote_item: str, delete_forever=False) -> None:
         """
@@ -344,19 +1053,25 @@ class RemoteDriveInterface:
             delete_forever (bool): A flag to tell us if we want to delete it permanently instead of trashing it
         """
 
-        if remote_item := self.get_remote_file(remote_item):
+        if remote_file := self.get_remote_file(remote_item):
 
             # Assuming the file exists then trash or delete it depending on user preferences
             if not delete_forever:
-                remote_item.Trash()
+                remote_file.Trash()
             else:
-                remote_item.Delete()
+                remote_file.Delete()
 
         else:
             raise RemotePathNotFound(remote_item)
 
-        # Update our local cache to reflect this change
-        self.update_file_manifest()
+        # The children of a folder are trashed or deleted along with it so we need to re-query everything, otherwise we
+        # can update our local cache in place to reflect this change
+        if remote_file['mimeType'] == FOLDER_MIME_TYPE:
+            self.update_file_manifest()
+        elif not delete_forever:
+            self.cache_file(remote_file, trashed=True)
+        else:
+            self.uncache_file(remote_file['id'])
 
     def recover_remote_file(self, remote_item: str) -> None:
         """
@@ -368,10 +1083,14 @@ class RemoteDriveInterface:
         """
 
         # Make sure the remote item is in the trash before trying to un-trash it
-        if remote_item := self.get_remote_file(remote_item, trashed=True):
-            remote_item.UnTrash()
+        if remote_file := self.get_remote_file(remote_item, trashed=True):
+            remote_file.UnTrash()
         else:
             raise RemotePathNotFound(remote_item)
 
-        # Update our local cache to reflect this change
-        self.update_file_manifest()
+        # The children of a folder are restored along with it so we need to re-query everything, otherwise we can update
+        # our local cache in place to reflect this change
+        if remote_file['mimeType'] == FOLDER_MIME_TYPE:
+            self.update_file_manifest()
+        else:
+            self.cache_file(remote_file)
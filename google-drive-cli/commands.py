@@ -1,17 +1,53 @@
-from pathlib import Path
-from typing import Dict
-
-from fuzzywuzzy import fuzz
+import os
+from collections import deque
+from functools import lru_cache
+from pathlib import Path, PurePosixPath
+from typing import Dict, Union
+
+from rapidfuzz import fuzz, process, utils
+from prompt_toolkit.auto_suggest import AutoSuggestFromHistory
 from prompt_toolkit.shortcuts import clear
 from prompt_toolkit.shortcuts.prompt import PromptSession
+from prompt_toolkit.validation import Validator
 
-from cloud import RemoteDriveInterface
+from cloud import FOLDER_MIME_TYPE, RemoteDriveInterface, pretty_date
 from exceptions import *
 
 # Create a new drive instance, prompt instance, and remote path
 DRIVE = RemoteDriveInterface()
-SESSION = PromptSession()
-REMOTE_FILE_PATH = Path('/')
+SESSION = PromptSession(auto_suggest=AutoSuggestFromHistory(), complete_in_thread=True)
+REMOTE_FILE_PATH = PurePosixPath('/')
+
+# Yes/no questions get their own prompt session that only accepts y, n, or c and keeps asking in place until it does
+YES_NO_SESSION = PromptSession(validate_while_typing=False, validator=Validator.from_callable(
+    lambda text: text in ('y', 'n', 'c'), error_message='Please answer y, n, or c', move_cursor_to_end=True))
+
+# The format each kind of file is listed with, trashed files are red, folders are purple, and everything else is cyan.
+# Each takes the verbose info, the title padded to 20 characters, and the line ending
+LISTING_FORMATS = {'trashed': '%s\x1b[31m%-20s%s', 'folder': '%s\x1b[35m%-20s%s', 'file': '%s\x1b[36m%-20s%s'}
+VERBOSE_FORMAT = '\x1b[36mOwners: \x1b[37m%s \x1b[36mModified: \x1b[37m%s \x1b[36mFile ID: \x1b[37m%s '
+
+# The share flags that pick the role to grant, the role is the flag without its leading dashes
+ROLE_FLAGS = ('--reader', '--writer', '--owner')
+
+
+@lru_cache(maxsize=256)
+def resolve_remote_path(user_input_path: Union[str, PurePosixPath], working_directory: PurePosixPath) -> PurePosixPath:
+    """
+    Turn a remote path into an absolute remote path, paths starting with '/' are already absolute and everything else
+    is relative to the working directory. Joining onto an absolute path simply replaces the working directory so both
+    cases are a single join. The working directory is part of the cache key so changing directories never hands back a
+    stale path.
+
+    Parameters:
+        user_input_path (Union[str, PurePosixPath]): The absolute or relative remote path the user typed in
+        working_directory (PurePosixPath): The remote directory relative paths start from
+
+    Returns:
+        The absolute remote path the user was referring to
+    """
+
+    return working_directory / user_input_path
 
 
 def ansi_yes_no_prompt(prompt: str) -> str:
@@ -27,13 +63,8 @@ def ansi_yes_no_prompt(prompt: str) -> str:
         decision (str): The either 'y' or 'n' response the user gave to the console
     """
 
-    while 1:
-
-        # Prompt the user for a yes/no response and dont complete until they answer
-        decision = SESSION.prompt(ANSI(f'\x1b[31m{prompt} '))
-
-        if decision in 'ync':
-            return decision
+    # The validator rejects anything else in place so the prompt only returns once the user has answered
+    return YES_NO_SESSION.prompt(ANSI(f'\x1b[31m{prompt} '))
 
 
 def change_directory(args: Dict) -> None:
@@ -58,22 +89,18 @@ def change_directory(args: Dict) -> None:
     # Make sure the user did not type in an empty change directory
     if user_input_path := (args['<PATH>'] or args['--remote']):
 
-        # If the user typed in cd / then move back to the root folder
-        if user_input_path.startswith('/'):
-            REMOTE_FILE_PATH = Path('/')
-            user_input_path = user_input_path[1:]
+        # Work out the absolute path we are moving to in one go, where every '..' moves up one folder. Nothing changes
+        # until the whole path is validated so a bad path leaves the user where they were
+        path_to_follow = PurePosixPath('/')
 
-        # If the user typed in cd ../ then move up one folder
-        elif user_input_path.startswith('../'):
-            REMOTE_FILE_PATH = Path(REMOTE_FILE_PATH.parent)
-            user_input_path = user_input_path[3:]
+        for part in resolve_remote_path(user_input_path, REMOTE_FILE_PATH).parts[1:]:
+            path_to_follow = path_to_follow.parent if part == '..' else path_to_follow / part
 
-        # Then compute the path we are validating and get the remote folder that represents this path
-        path_to_follow = REMOTE_FILE_PATH / user_input_path
+        # Then get the remote folder that represents this path
         folder = DRIVE.get_remote_file(path_to_follow)
 
         # If we found a matching folder and it isn't a file then "move" there otherwise print a help message
-        if folder and (folder == DRIVE.drive_root or folder['mimeType'] == 'application/vnd.google-apps.folder'):
+        if folder and (folder == DRIVE.drive_root or folder['mimeType'] == FOLDER_MIME_TYPE):
             REMOTE_FILE_PATH = path_to_follow
 
         # If no file path exists then the user is trying to go somewhere that doesnt exist
@@ -111,48 +138,43 @@ def list_directory(args: Dict) -> None:
     """
 
     # Get all of the children of the parent and decode the line ending for formatted printing
-    remote_path = args['--remote'] or REMOTE_FILE_PATH
+    remote_path = resolve_remote_path(args['--remote'] or '.', REMOTE_FILE_PATH)
     remote_file = DRIVE.get_remote_file(remote_path, trashed=args['--all'])
-    all_children = DRIVE.get_object_children(remote_file['id'], trashed=args['--all'])
+    all_children = DRIVE.get_object_children(remote_file['id'], trashed=args['--all'], starred_only=args['--starred'])
 
-    for idx, obj in enumerate(all_children):
+    # Build the whole listing up front and print it all at once rather than going through the terminal once per file
+    listing, verbose = list(), args['--verbose']
 
-        # If the user only wants to list starred files and this one is not starred then skip
-        if args['--starred'] and not obj['labels']['starred']:
-            continue
+    for idx, obj in enumerate(all_children):
 
-        # Determine the end line character and the verbose info string for this iteration
-        end_line = ' ' if (idx % 5 or idx == 0) and not args['--verbose'] else '\n'
+        # Verbose listings have one file per line otherwise files are listed five to a row
+        end_line = '\n' if verbose or idx % 5 == 4 else ' '
         verbose_info = ''
 
         # If the user asked for verbose info then create the verbose info string and reassign it from the default
-        if args['--verbose']:
-            pretty_date = obj['modifiedDate'][:obj['modifiedDate'].index('.')].replace('T', ' ')
-            verbose_info = f"\x1b[36mOwners: \x1b[37m{obj['ownerNames']} \x1b[36mModified: \x1b[37m{pretty_date} " \
-                           f"\x1b[36mFile ID: \x1b[37m{obj['id']} "
+        if verbose:
+            verbose_info = VERBOSE_FORMAT % (obj['ownerNames'], pretty_date(obj['modifiedDate']), obj['id'])
 
-        # If the filetype is a folder then print it as purple, files are cyan, and trashed are red (only for -a flag)
+        # Color the title by what kind of file it is, trashed files can only show up with the -a flag
         if obj['labels']['trashed']:
-            print_formatted_text(ANSI(f"{verbose_info}\x1b[31m{obj['title']:20s}"), end=end_line)
-
-        elif obj['mimeType'] == 'application/vnd.google-apps.folder':
-            print_formatted_text(ANSI(f"{verbose_info}\x1b[35m{obj['title']:20s}"), end=end_line)
-
+            kind = 'trashed'
         else:
-            print_formatted_text(ANSI(f"{verbose_info}\x1b[36m{obj['title']:20s}"), end=end_line)
+            kind = 'folder' if obj['mimeType'] == FOLDER_MIME_TYPE else 'file'
+
+        listing.append(LISTING_FORMATS[kind] % (verbose_info, obj['title'], end_line))
 
-    # Then print a newline at the end for separation
-    print_formatted_text("")
+    # Then print the listing followed by a newline at the end for separation
+    print_formatted_text(ANSI(''.join(listing)))
 
 
-def upload_local_files(args: Dict, recursed=False) -> None:
+def upload_local_files(args: Dict) -> None:
     """
 
     Uploads a file present on the local disk specified by LOCAL to the remote Google Drive server in location REMOTE
 
-    A couple important things to bear in mind is that when attempting to upload a folder it works but will requite the
-    --folder flag. However even when doing this it will not upload any sub-folders unless '--recursive' is also set so
-    we also upload sob-folders else only immediate files of the specified folder will be uploaded to the server.
+    A couple important things to bear in mind is that when attempting to upload a folder it works but will requite
+    the '--folder' flag. However even when doing this it will not upload any sub-folders unless '--recursive' is also
+    set so we also upload sob-folders else only immediate files of the specified folder will be uploaded to the server.
 
     Usage:
         push [options] (--local=<LOCAL> | <LOCAL>) (--remote=<REMOTE> | <REMOTE>)
@@ -167,34 +189,46 @@ def upload_local_files(args: Dict, recursed=False) -> None:
     local = args['<LOCAL>'] or args['--local']
 
     # Use the absolute path if the user wants otherwise use the relative path from the cwd
-    remote_path = Path(remote) if remote.startswith('/') else REMOTE_FILE_PATH / remote
-    local_path = Path(local) if local.startswith('/') else Path.home() / local
+    remote_path = resolve_remote_path(remote, REMOTE_FILE_PATH)
+    local_path = Path.home() / local
 
     # Make sure the local path exists before attempting to upload it
     if not local_path.exists():
         raise LocalPathNotFound(local_path)
 
     # Then make sure the remote path exists or the user is okay with creating it
-    if not DRIVE.get_remote_file(remote_path) and not recursed:
+    if not DRIVE.get_remote_file(remote_path):
         if ansi_yes_no_prompt('Remote path does not exist. Create anyways (y/n/c)?') in 'nc':
             return
 
     if args['--folder'] and local_path.is_dir():  # Make sure that folder option is enabled with folders
 
-        for file in local_path.iterdir():  # Iterate over all files in the source directory
+        # Walk the local folder breadth first, each entry is a local folder, its remote path, and the remote folder
+        folders = deque([(local_path, remote_path, DRIVE.create_file_path(remote_path))])
+
+        while folders:
+
+            local_folder, remote_folder_path, folder = folders.popleft()
+
+            # Scanning the folder hands back the type of every entry along with its name so telling files and folders
+            # apart below needs no extra stat calls
+            with os.scandir(local_folder) as entries:
+                local_files = list(entries)
+
+            # When recursing, create every missing remote sub-folder of this directory in one batch and queue them all
+            if args['--recursive']:
 
-            # Get the local and remote path's for the files to be placed
-            absolute_local, absolute_remote = str(file), str(remote_path / file.name)
+                sub_folders = {file.name: DRIVE.get_child_file(folder, file.name)
+                               for file in local_files if file.is_dir()}
+                missing_folders = [name for name, sub_folder in sub_folders.items() if not sub_folder]
+                sub_folders.update(zip(missing_folders, DRIVE.create_folders(folder, missing_folders)))
 
-            # If the file is a directory and we are uploading recursively then recursively upload that folder
-            if file.is_dir() and args['--recursive']:
-                recur_args = args.copy()
-                recur_args['<LOCAL'], recur_args['<REMOTE>'] = absolute_local, absolute_remote
-                upload_local_files(recur_args, recursed=True)
+                folders.extend((local_folder / name, remote_folder_path / name, sub_folder)
+                               for name, sub_folder in sub_folders.items())
 
-            # Otherwise just upload the file like normal
-            elif file.is_file():
-                DRIVE.create_file(absolute_local, absolute_remote)
+            # Then upload all of the files of this folder in parallel
+            DRIVE.create_files([(Path(file.path), remote_folder_path / file.name)
+                                for file in local_files if file.is_file()], folder)
 
     # If the user wants to upload a single file then just upload it easily
     elif local_path.is_file():
@@ -206,7 +240,7 @@ def upload_local_files(args: Dict, recursed=False) -> None:
                                   'to upload a directories'))
 
 
-def download_remote_file(args: Dict, parent_folder=None, recursed=False) -> None:
+def download_remote_file(args: Dict) -> None:
     """
 
     Download a given remote file or folder specified by REMOTE and save it to a local location LOCAL
@@ -224,36 +258,41 @@ def download_remote_file(args: Dict, parent_folder=None, recursed=False) -> None
     local = args['<LOCAL>'] or args['--local']
 
     # Use the absolute path if the user starts from the root, otherwise use the relative path from the cwd
-    remote_path = Path(remote) if remote.startswith('/') else REMOTE_FILE_PATH / remote
-    local_path = Path(local) if local.startswith('/') else Path.home() / local
-    remote_file = DRIVE.get_remote_file(remote_path) if parent_folder is None else parent_folder
+    remote_path = resolve_remote_path(remote, REMOTE_FILE_PATH)
+    local_path = Path.home() / local
+    remote_file = DRIVE.get_remote_file(remote_path)
 
     # Make sure the local path either exists or the user is okay with creating it
-    if not local_path.parent.exists() and not recursed:
+    if not local_path.parent.exists():
         if ansi_yes_no_prompt('Local path does not exist. Create anyways (y/n/c)?') in 'nc':
             return
 
     if remote_file:  # Make sure the remote file is present on the server before trying to download it
 
-        if args['--folder'] and remote_file['mimeType'] == 'application/vnd.google-apps.folder':
+        if args['--folder'] and remote_file['mimeType'] == FOLDER_MIME_TYPE:
 
-            for drive_file in DRIVE.get_object_children(remote_file['id']):
+            downloads, folders = list(), [(remote_file, local_path)]
 
-                # Get the local and remote path's for the files
-                absolute_local, absolute_remote = local_path / drive_file['title'], remote_path / drive_file['title']
+            # Walk the remote folder using only the cached manifest to find every file we need, then download them all
+            while folders:
 
-                # If the file is a directory and we are uploading recursively then recursively download the folder
-                if drive_file['mimeType'] == 'application/vnd.google-apps.folder' and args['--recursive']:
-                    recur_args = args.copy()
-                    recur_args['<LOCAL>'], recur_args['<REMOTE>'] = str(absolute_local), str(absolute_remote)
-                    download_remote_file(recur_args, parent_folder=drive_file, recursed=True)
+                folder, folder_path = folders.pop()
 
-                # Otherwise just download the single file as normal
-                else:
-                    DRIVE.download_file(absolute_remote, absolute_local)
+                for drive_file in DRIVE.get_object_children(folder['id']):
+
+                    # If the file is a directory and we are downloading recursively then walk that folder as well
+                    if drive_file['mimeType'] == FOLDER_MIME_TYPE:
+                        if args['--recursive']:
+                            folders.append((drive_file, folder_path / drive_file['title']))
+
+                    # Otherwise just queue up the single file to be downloaded
+                    else:
+                        downloads.append((drive_file, folder_path / drive_file['title']))
+
+            DRIVE.download_files(downloads)
 
         # If the user is trying to download a folder without the proper flags then let them know
-        elif remote_file['mimeType'] == 'application/vnd.google-apps.folder':
+        elif remote_file['mimeType'] == FOLDER_MIME_TYPE:
             print_formatted_text(ANSI('\x1b[31mThe given local path is a directory, use the "--folder" option if you '
                                       'wish to upload a directories'))
 
@@ -281,73 +320,74 @@ def list_single_file_verbose(args: Dict):
 
     # Get the remote path of the file/folder to print out the verbose information for
     remote = args['<REMOTE>'] or args['--remote']
-    remote_path = Path(remote) if remote.startswith('/') else REMOTE_FILE_PATH / remote
+    remote_path = resolve_remote_path(remote, REMOTE_FILE_PATH)
 
     if remote_file := DRIVE.get_remote_file(remote_path):  # Get the google drive file of this path
 
+        # The cached manifest only holds a few fields of each file so fetch the full metadata for this one
+        remote_file.FetchMetadata()
         file_permissions = remote_file.GetPermissions()
 
-        # Print newline character to separate from input line for readability
-        print_formatted_text("")
-
         # Preparse the modified and created dates into their pretty forms
-        pretty_mod_date = remote_file['modifiedDate'][:remote_file['modifiedDate'].index('.')].replace('T', ' ')
-        pretty_create_date = remote_file['createdDate'][:remote_file['createdDate'].index('.')].replace('T', ' ')
+        pretty_mod_date = pretty_date(remote_file['modifiedDate'])
+        pretty_create_date = pretty_date(remote_file['createdDate'])
+
+        # Collect every line of the report and print it all at once at the end, starting with an empty line to separate
+        # from the input line for readability
+        report = ['']
 
-        # Then print the important identifying information about this file
-        print_formatted_text(ANSI(f"\x1b[35mIdentifying Information"))
-        print_formatted_text(ANSI(f"\x1b[36mDisplay Name: \x1b[37m{remote_file['title']}"))
-        print_formatted_text(ANSI(f"\x1b[36mInternal File ID: \x1b[37m{remote_file['id']}"))
-        print_formatted_text("")
+        # Then add the important identifying information about this file
+        report.append("\x1b[35mIdentifying Information")
+        report.append(f"\x1b[36mDisplay Name: \x1b[37m{remote_file['title']}")
+        report.append(f"\x1b[36mInternal File ID: \x1b[37m{remote_file['id']}")
+        report.append("")
 
-        # Then print the labels that the file has attached to it that the end user would care about
-        print_formatted_text(ANSI(f'\x1b[35mFile Labels'))
+        # Then add the labels that the file has attached to it that the end user would care about
+        report.append('\x1b[35mFile Labels')
 
-        for label, label_val in remote_file['labels'].items():
-            if label_val:
-                print_formatted_text(ANSI(f'\x1b[37m{label.title()}'), end=', ')
+        labels = [label.title() for label, label_val in remote_file['labels'].items() if label_val]
 
         if remote_file['copyable']:
-            print_formatted_text(ANSI(f'\x1b[37mCopyable'), end=', ')
+            labels.append('Copyable')
 
         if remote_file['editable']:
-            print_formatted_text(ANSI(f'\x1b[37mEditable'), end=', ')
-
-        print_formatted_text("\n")
-
-        # Then print some metadata statistics about this file
-        print_formatted_text(ANSI(f"\x1b[35mMetadata"))
-        print_formatted_text(ANSI(f"\x1b[36mDate Created: \x1b[37m{pretty_create_date}"))
-        print_formatted_text(ANSI(f"\x1b[36mLast Modified: \x1b[37m{pretty_mod_date}"))
-        print_formatted_text(ANSI(f"\x1b[36mFile Type: \x1b[37m{remote_file['mimeType']}"))
-        print_formatted_text("")
-
-        # Then print all users who are in the owners group of this file
-        print_formatted_text(ANSI("\x1b[35mOwners"))
-
-        for user in remote_file['ownerNames']:
-            print_formatted_text(ANSI(f"\x1b[37m{user}"), end=', ')
-
-        print_formatted_text("\n")
-
-        # Then print some simple sharing information about this file
-        print_formatted_text(ANSI(f"\x1b[35mSharing Information"))
-        print_formatted_text(ANSI(f"\x1b[36mShared With Others: \x1b[37m{remote_file['shared']}"))
-        print_formatted_text(ANSI(f"\x1b[36mSharing Link Active: \x1b[37m"
-                                  f"{'anyoneWithLink' in [perm['id'] for perm in file_permissions]}"))
-        print_formatted_text(ANSI(f"\x1b[36mSharing Link: \x1b[37m{remote_file['alternateLink']}"))
-        print_formatted_text("")
-
-        # Finally print all users who have access to this file
-        print_formatted_text(ANSI(f"\x1b[35mUser Permissions"))
+            labels.append('Editable')
+
+        report.append('\x1b[37m' + ', '.join(labels))
+        report.append("")
+
+        # Then add some metadata statistics about this file
+        report.append("\x1b[35mMetadata")
+        report.append(f"\x1b[36mDate Created: \x1b[37m{pretty_create_date}")
+        report.append(f"\x1b[36mLast Modified: \x1b[37m{pretty_mod_date}")
+        report.append(f"\x1b[36mFile Type: \x1b[37m{remote_file['mimeType']}")
+        report.append("")
+
+        # Then add all users who are in the owners group of this file
+        report.append("\x1b[35mOwners")
+        report.append('\x1b[37m' + ', '.join(remote_file['ownerNames']))
+        report.append("")
+
+        # Then add some simple sharing information about this file
+        report.append("\x1b[35mSharing Information")
+        report.append(f"\x1b[36mShared With Others: \x1b[37m{remote_file['shared']}")
+        link_active = any(perm['id'] == 'anyoneWithLink' for perm in file_permissions)
+        report.append(f"\x1b[36mSharing Link Active: \x1b[37m{link_active}")
+        report.append(f"\x1b[36mSharing Link: \x1b[37m{remote_file['alternateLink']}")
+        report.append("")
+
+        # Finally add all users who have access to this file
+        report.append("\x1b[35mUser Permissions")
 
         for user in file_permissions:
             if user['id'] != 'anyoneWithLink':
-                print_formatted_text(ANSI(f"\x1b[36mName: \x1b[37m{user['name']} \x1b[36mEmail: \x1b[37m"
-                                          f"{user['emailAddress']} \x1b[36mRole: \x1b[37m{user['role']}"))
+                report.append(f"\x1b[36mName: \x1b[37m{user['name']} \x1b[36mEmail: \x1b[37m"
+                              f"{user['emailAddress']} \x1b[36mRole: \x1b[37m{user['role']}")
 
         # Finally separate with newline from the following input line
-        print_formatted_text("")
+        report.append("")
+
+        print_formatted_text(ANSI('\n'.join(report)))
 
 
 def manage_permissions(args: Dict):
@@ -371,19 +411,14 @@ def manage_permissions(args: Dict):
 
     # Get the remote path of the file/folder to share with people
     remote = args['<REMOTE>'] or args['--remote']
-    remote_path = Path(remote) if remote.startswith('/') else REMOTE_FILE_PATH / remote
+    remote_path = resolve_remote_path(remote, REMOTE_FILE_PATH)
 
     if remote_file := DRIVE.get_remote_file(remote_path):  # Make sure the object actually exists first
 
         if args['--add']:  # We are adding permissions to the file
 
-            # If we are adding permissions then iterate over all of the args in items and set the role_input var to
-            # whichever role_flag is set [-r, -w, -o]
-            role_input = None
-
-            for role, val in args.items():
-                if val and role in ['--writer', '--reader', '--owner']:
-                    role_input = role.replace('-', '')
+            # If we are adding permissions then set the role_input var to whichever role flag is set [-r, -w, -o]
+            role_input = next((flag[2:] for flag in ROLE_FLAGS if args.get(flag)), None)
 
             if role_input is not None:  # If we are adding a valid role then progress further
 
@@ -392,14 +427,13 @@ def manage_permissions(args: Dict):
                 share_type = 'anyone' if args['--link'] else 'user'
                 who_can_access = ['anyone'] if args['--link'] else args['EMAILS']
 
-                # Iterate over all emails in the accessors list and update the permissions to let them in
-                for email in who_can_access:
-                    remote_file.InsertPermission({
-                        'type': share_type,
-                        'value': email,
-                        'role': role_input,
-                        'withLink': args['--link']
-                    })
+                # Update the permissions to let all emails in the accessors list in with a single batched request
+                DRIVE.insert_permissions(remote_file, [{
+                    'type': share_type,
+                    'value': email,
+                    'role': role_input,
+                    'withLink': args['--link']
+                } for email in who_can_access])
 
                 # If the list of accessors is empty then the user needs to be told they used the command wrong
                 if not who_can_access and not args['--quiet']:
@@ -407,6 +441,7 @@ def manage_permissions(args: Dict):
 
                 # If the user is trying to make a sharing link then print it to the console
                 if args['--link']:
+                    remote_file.FetchMetadata(fields='alternateLink')
                     print_formatted_text(ANSI(f"\x1b[36mSharable Link: {remote_file['alternateLink']}"))
 
             # If no role is given for the add command then we have a problem and cannot continue
@@ -419,18 +454,21 @@ def manage_permissions(args: Dict):
 
                 # If the user is not attempting to delete a sharing link then they should have input emails to delete
                 # so iterate over the permissions to find them
-                valid_users = set()
+                emails, valid_users, permission_ids = set(args['EMAILS']), set(), list()
 
                 for user in remote_file.GetPermissions():
 
-                    # If we come across a user with the given email address then delete their permissions
-                    if (email := user.get('emailAddress')) in args['EMAILS']:
-                        remote_file.DeletePermission(user['id'])
+                    # If we come across a user with the given email address then mark their permissions for deletion
+                    if (email := user.get('emailAddress')) in emails:
+                        permission_ids.append(user['id'])
                         valid_users.add(email)
 
+                # Then delete all of the marked permissions with a single batched request
+                DRIVE.delete_permissions(remote_file, permission_ids)
+
                 # If not all emails given are present in the permissions for the file then let the user know
-                if not valid_users == set(args['EMAILS']) and not args['--quiet']:
-                    raise PermissionNonExistent(set(args['EMAILS']) - valid_users)
+                if not valid_users == emails and not args['--quiet']:
+                    raise PermissionNonExistent(emails - valid_users)
 
             # Otherwise we know the user is trying to delete a share link and can skip iteration
             else:
@@ -456,12 +494,12 @@ def move_remote_file(args: Dict):
     dest = args['<DEST>'] or args['--remote-dest']
 
     # Get the full path's for both the current file location and the destination location
-    remote_source = Path(source) if source.startswith('/') else REMOTE_FILE_PATH / source
-    remote_dest = Path(dest) if dest.startswith('/') else REMOTE_FILE_PATH / dest
+    remote_source = resolve_remote_path(source, REMOTE_FILE_PATH)
+    remote_dest = resolve_remote_path(dest, REMOTE_FILE_PATH)
 
     # Then get the actual google drive files for the parent of the current location and the destination parent
-    source_parent = DRIVE.get_remote_file(remote_source.parent.name)
-    dest_parent = DRIVE.get_remote_file(remote_dest.parent.name)
+    source_parent = DRIVE.get_remote_file(remote_source.parent)
+    dest_parent = DRIVE.get_remote_file(remote_dest.parent)
 
     if (remote_file := DRIVE.get_remote_file(remote_source)) and source_parent:
 
@@ -474,7 +512,7 @@ def move_remote_file(args: Dict):
             dest_parent = DRIVE.create_file_path(remote_dest.parent)
 
         # Make sure the mimetype of the file is correct as we cannot parent to a non folder and update the metadata
-        if dest_parent.get('mimeType', 'application/vnd.google-apps.folder') == 'application/vnd.google-apps.folder':
+        if dest_parent.get('mimeType', FOLDER_MIME_TYPE) == FOLDER_MIME_TYPE:
 
             parents = [{'id': parent['id']} for parent in remote_file['parents'] if parent['id'] != source_parent['id']]
             parents.append({'id': dest_parent['id']})
@@ -482,6 +520,9 @@ def move_remote_file(args: Dict):
             remote_file['title'], remote_file['parents'] = remote_dest.name, parents
             remote_file.Upload()
 
+            # Update the local cache to reflect the new title and parents of this file
+            DRIVE.cache_file(remote_file)
+
         # If the remote destination was a non folder type then let the user know they cannot do that
         else:
             raise RemotePathIsFile(args['<DEST>'])
@@ -509,43 +550,27 @@ def search_remote_file(args: Dict):
         -h, --help      Shows this message
     """
 
-    # Define a quick function to return a list of all possible paths to a given file
-    def determine_file_path(remote_file):
-
-        paths = list()  # List to insert all paths into
-
-        # If the remote file we are given is the root then we can simply return the root character in POSIX paths
-        if remote_file['id'] == DRIVE.drive_root['id']:
-            return ['/']
+    # Then we want to look at every distinct title that could match, so a title shared by many files is only checked
+    # once and we only look at the files themselves once their title has matched
+    if args['--fuzzy']:
 
-        # If we are a non-root file then we need to look at the paths for all parents and extend them with ourselves
-        for parent in map(lambda f: DRIVE.files.get(f['id'], DRIVE.drive_root), remote_file['parents']):
+        # Fuzzy matching ie the input has to be kinda close to the file name, every title is scored in a single call to
+        # the scorer and the cutoff lets it give up on a title as soon as it knows the title cannot reach it. The titles
+        # were already normalized when they were cached so only the input needs normalizing here
+        matches = process.extract(utils.default_process(args['<TERM>']), DRIVE.files.normalized_titles,
+                                  scorer=fuzz.partial_token_sort_ratio, processor=None, score_cutoff=80, limit=None)
+        titles = [title for _, _, title in matches]
 
-            # Get all of the possible paths to this parent of our file and merge them with the current file
-            for parent_path in determine_file_path(parent):
-                partial_path = Path(parent_path, DRIVE.files[remote_file['id']]['title'])
-                paths.append(partial_path.as_posix())
-
-        # Return all of the paths to this file from all of its parents
-        return paths
-
-    # This function will use strict matching ie the input has to be the same
-    def strict_match(user_input, title):
-        return user_input in title
-
-    # This function will use fuzzy matching ie the input has to be kinda close to the file name and it will catch it
-    def fuzzy_match(user_input, title):
-        return 80 <= fuzz.partial_token_sort_ratio(user_input, title)
-
-    # Decide which kind of matching we want to use in our file search
-    string_match_func = fuzzy_match if args['--fuzzy'] else strict_match
+    else:
 
-    # Then we want to look at all files and check for a potential match
-    for file in DRIVE.files.values():
+        # Strict matching ie the input has to be in the title, such titles must contain every pair of adjacent
+        # characters of the input so the bigram index can narrow them down first
+        titles = [title for title in DRIVE.files.titles_possibly_containing(args['<TERM>']) if args['<TERM>'] in title]
 
-        # If we are determined to have matched then get all potential paths to this file and print them to the console
-        if string_match_func(args['<TERM>'], file['title']):
-            for potential_path in determine_file_path(file):
+    # Then get all potential paths to the files with a matching title and print them to the console
+    for title in titles:
+        for file in DRIVE.files.files_titled(title):
+            for potential_path in DRIVE.get_file_paths(file):
                 print_formatted_text(ANSI(f'\x1b[36m{potential_path}'))
 
 
@@ -567,7 +592,7 @@ def remove_file(args: Dict):
 
     # Get the remote path to a file and then use the drive to delete it
     remote = args['<REMOTE>'] or args['--remote']
-    remote_path = Path(remote) if remote.startswith('/') else REMOTE_FILE_PATH / remote
+    remote_path = resolve_remote_path(remote, REMOTE_FILE_PATH)
     DRIVE.delete_remote_file(remote_path)
 
 
@@ -585,7 +610,7 @@ def recover_file(args: Dict):
 
     # Get the remote path to a file and then use the drive to un-delete it
     remote = args['<REMOTE>'] or args['--remote']
-    remote_path = Path(remote) if remote.startswith('/') else REMOTE_FILE_PATH / remote
+    remote_path = resolve_remote_path(remote, REMOTE_FILE_PATH)
     DRIVE.recover_remote_file(remote_path)
 
 
@@ -1,32 +1,100 @@
 import getpass
 import shlex
-from pathlib import Path
+from functools import lru_cache
+from pathlib import PurePosixPath
 
-from docopt import docopt
+from docopt import (AnyOptions, DocoptExit, Option, TokenStream, extras, formal_usage, parse_argv, parse_defaults,
+                    parse_pattern, printable_usage)
 from prompt_toolkit import ANSI
-from prompt_toolkit.auto_suggest import AutoSuggestFromHistory
-from prompt_toolkit.completion import Completer, Completion
 from prompt_toolkit.shortcuts.utils import print_formatted_text
 
 import commands as cli
 from exceptions import GoogleDriveCLIException
 
 
-# A dictionary linking all string commands with their associated function
-FUNCTION_COMMANDS = {
-    'ls': cli.list_directory,
-    'cd': cli.change_directory,
-    'push': cli.upload_local_files,
-    'pull': cli.download_remote_file,
-    'rm': cli.remove_file,
-    'mv': cli.move_remote_file,
-    'recover': cli.recover_file,
-    'info': cli.list_single_file_verbose,
-    'share': cli.manage_permissions,
-    'search': cli.search_remote_file,
-    'clear': cli.clear_screen,
-    'exit': cli.exit_shell,
-}
+def compile_usage(docstring: str):
+    """
+    Compiles the usage pattern of a command docstring the same way docopt does on every call, so that it only has to
+    be done once per command. This includes filling in the [options] shortcut with every option the docstring lists
+    that the usage pattern does not already mention.
+
+    Parameters:
+        docstring (str): The docstring of the command function that docopt reads the usage and options from
+
+    Returns:
+        A tuple of the docstring, its printable usage, its options, and its compiled usage pattern
+    """
+
+    usage = printable_usage(docstring)
+    options = parse_defaults(docstring)
+    pattern = parse_pattern(formal_usage(usage), options)
+
+    # The [options] shortcut stands for every option in the docstring that is not already in the usage pattern
+    pattern_options = set(pattern.flat(Option))
+
+    for any_options in pattern.flat(AnyOptions):
+        any_options.children = list(set(options) - pattern_options)
+
+    return docstring, usage, options, pattern.fix()
+
+
+# A dictionary linking every string command with its function and the usage compiled from the docstring of that
+# function, so dispatching a command and matching its arguments is a single lookup
+COMMANDS = {command: (function, compile_usage(function.__doc__)) for command, function in (
+    ('ls', cli.list_directory),
+    ('cd', cli.change_directory),
+    ('push', cli.upload_local_files),
+    ('pull', cli.download_remote_file),
+    ('rm', cli.remove_file),
+    ('mv', cli.move_remote_file),
+    ('recover', cli.recover_file),
+    ('info', cli.list_single_file_verbose),
+    ('share', cli.manage_permissions),
+    ('search', cli.search_remote_file),
+    ('clear', cli.clear_screen),
+    ('exit', cli.exit_shell),
+)}
+
+
+# The flags that ask docopt to print the help screen of a command, which exits parsing without it being an error
+HELP_FLAGS = frozenset(('-h', '--help'))
+
+# The user running the shell never changes so their name is only looked up once
+USER_NAME = getpass.getuser()
+
+
+@lru_cache(maxsize=32)
+def shell_prompt(working_directory: PurePosixPath) -> ANSI:
+    """Builds the shell prompt for a remote working directory, cached since it only changes when the user changes it"""
+
+    return ANSI(f"\x1b[32m{USER_NAME}@google-drive\x1b[37m:\x1b[34m~{working_directory}\x1b[37m$ ")
+
+
+def match_arguments(compiled_usage: tuple, arguments: list) -> dict:
+    """
+    Matches the arguments given to a command against its compiled usage pattern, exactly like calling docopt with the
+    docstring of the command would. That means asking for help prints the docstring and bad arguments raise DocoptExit.
+
+    Parameters:
+        compiled_usage (tuple): The compiled usage of the command, as returned by compile_usage
+        arguments (list): The arguments the user gave to the command, already split
+
+    Returns:
+        A dictionary linking every option and argument in the usage to its value
+    """
+
+    docstring, usage, options, pattern = compiled_usage
+
+    DocoptExit.usage = usage
+    argv = parse_argv(TokenStream(arguments, DocoptExit), list(options), False)
+    extras(True, None, argv, docstring)
+
+    matched, left, collected = pattern.match(argv)
+
+    if matched and not left:
+        return dict((leaf.name, leaf.value) for leaf in pattern.flat() + collected)
+
+    raise DocoptExit()
 
 
 def parse_user_input(user_input: str):
@@ -34,9 +102,8 @@ def parse_user_input(user_input: str):
     A function to parse user input into a friendly form using the docopt library. We firstly need to split the user
     input on spaces unless in quotation marks (files can have spaces in names) so we need to use shlex to do this and
     subsequently separate teh command given from the arguments. Then we can attempt to return the given command along
-    with the arguments parsed out by docopt. We use a simply little trick where we get the get the function pointer for
-    the given command and can use __doc__ to get the docstring for docopt parsing with the arguments being everything
-    in the user input that is not the command.
+    with the arguments parsed out by docopt. The usage in the docstring of every command was compiled when the shell
+    started so the arguments, being everything in the user input that is not the command, only need matching against it.
 
     Parameters:
         user_input (str): The string representing the raw user input to the shell application
@@ -44,24 +111,25 @@ def parse_user_input(user_input: str):
 
     try:
 
-        # Split the full command into its parts but ignore space in quotes
-        full_command = shlex.split(user_input)
-        command, arguments = full_command[0], full_command[1:]
-
-        # Attempt to parse the arguments using docopt and a function pointer to their docstring
-        return command, docopt(FUNCTION_COMMANDS[command].__doc__, argv=arguments)
+        # Split the full command into its parts but ignore space in quotes, input of only spaces has no command at all
+        command, *arguments = shlex.split(user_input) or ['']
 
-    except (SystemExit, KeyError) as e:
+        # Attempt to match the arguments against the usage pattern compiled from the docstring of the command
+        return command, match_arguments(COMMANDS[command][1], arguments)
 
-        # If the error was caused by the user issuing a non-valid command then let them know
-        if type(e) is KeyError:
+    # If the error was caused by the user issuing a non-valid command then let them know
+    except KeyError:
+        if command:
             print_formatted_text(ANSI(f'\x1b[31mCommand "{command}" is not recognized as a valid command!'))
 
-        # Otherwise check to make sure they user gave invalid arguments and not asking for help
-        elif '-h' not in arguments and '--help' not in arguments:
+        # Return an empty dictionary to let run_shell know we failed
+        return command, dict()
+
+    # Otherwise docopt exited so check to make sure the user gave invalid arguments and was not asking for help
+    except SystemExit:
+        if HELP_FLAGS.isdisjoint(arguments):
             print_formatted_text(ANSI(f'\x1b[31mInvalid arguments for command "{command}" -> {arguments}'))
 
-        # Return an empty dictionary to let execute_shell know we failed
         return command, dict()
 
     except ValueError:
@@ -70,44 +138,46 @@ def parse_user_input(user_input: str):
         return '', dict()
 
 
-def execute_shell():
+def run_shell() -> None:
     """
-    A function to prompt the user for input and if the user gave valid input then attempt to parse it, if parsing was
-    successful then attempt to execute the given command which means grabbing the function pointer from the the
-    FUNCTION_COMMANDS dictionary and invoking it with the supplied arguments given that we have defined a function for
-    the entered command.
+    Runs the shell until the user exits it. Every time around we prompt the user for input and if the user gave valid
+    input then attempt to parse it, if parsing was successful then attempt to execute the given command which means
+    grabbing the function pointer from the the COMMANDS dictionary and invoking it with the supplied arguments given
+    that we have defined a function for the entered command.
     """
 
-    try:
+    while True:
 
-        # On an execution of the shell we want to prompt the user for input
-        user_input = cli.SESSION.prompt(
-            ANSI(f"\x1b[32m{getpass.getuser()}@google-drive\x1b[37m:\x1b[34m~{cli.REMOTE_FILE_PATH}\x1b[37m$ "),
-            auto_suggest=AutoSuggestFromHistory(),
-            complete_in_thread=True
-        )
+        try:
 
-        if user_input:
+            # On every turn of the shell we want to prompt the user for input
+            user_input = cli.SESSION.prompt(shell_prompt(cli.REMOTE_FILE_PATH))
 
-            # Then we want to parse that input using docopt assuming it was non zero
-            command, arguments = parse_user_input(user_input)
+            if user_input:
 
-            # Make sure that docopt didnt fail or the user asked for a help command and invoke the function
-            if arguments and command:
-                FUNCTION_COMMANDS[command](arguments)
+                # Then we want to parse that input using docopt assuming it was non zero
+                command, arguments = parse_user_input(user_input)
 
-    # If we try to create or access files that we are not allowed to then let the user know
-    except PermissionError as e:
-        print_formatted_text(ANSI(f"\x1b[31mCannot create or access file location '{e.filename}'. Permission denied!"))
+                # Make sure that docopt didnt fail or the user asked for a help command and invoke the function
+                if arguments and command:
 
-    # If a GoogleDriveCLIException is raised then it will print an error message to the user and we can continue
-    except GoogleDriveCLIException:
-        pass
+                    function, _ = COMMANDS[command]
+
+                    # Remember path lookups for the length of this command so it never resolves the same path twice
+                    with cli.DRIVE.request_cache():
+                        function(arguments)
+
+        # If we try to create or access files that we are not allowed to then let the user know
+        except PermissionError as e:
+            print_formatted_text(ANSI(f"\x1b[31mCannot create or access file location '{e.filename}'. "
+                                      f"Permission denied!"))
+
+        # If a GoogleDriveCLIException is raised then it will print an error message to the user and we can continue
+        except GoogleDriveCLIException:
+            pass
 
 
 if __name__ == '__main__':
 
     cli.clear_screen({})
-
-    while 1:
-        execute_shell()
+    run_shell()
@@ -2,7 +2,7 @@ import setuptools
 
 
 # Get the long description from the README
-with open('README.md', 'r') as file:
+with open('README.md', 'r', encoding='utf-8') as file:
     long_description = file.read()
 
 
@@ -23,7 +23,7 @@ setuptools.setup(
     package_dir={'': 'google-drive-cli'},
     py_modules=['cloud', 'commands', 'exceptions', 'main'],
 
-    install_requires=['prompt-toolkit', 'pydrive2', 'fuzzywuzzy', 'python-Levenshtein'],
+    install_requires=['docopt>=0.6.2', 'prompt-toolkit', 'pydrive2', 'rapidfuzz'],
     classifiers=[
         "Programming Language :: Python :: 3",
         "Operating System :: OS Independent",